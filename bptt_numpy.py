@@ -1,8 +1,15 @@
 """
 Backpropagation Through Time (BPTT) - NumPy Implementation
 ----------------------------------------------------------
-A minimal, transparent implementation of BPTT for a simple RNN,
-faithfully following Werbos's original equations and pseudocode.
+BPTT for a simple RNN, following Werbos's original equations. The forward and
+backward passes run as two kernels compiled with Numba when it is installed
+(plain NumPy otherwise) that work on time-major (T, batch, features) arrays:
+- the input/output projections and weight gradients are single matrix products
+  over all time steps, leaving only the recurrence through W_rec sequential;
+- mini-batches of sequences turn every per-step product into a GEMM;
+- activations and gradients live in buffers preallocated on the model.
+SimpleRNNBPTT wraps the kernels with a per-sequence API, and train_one/sweep
+run independent training runs in parallel with joblib.
 
 References:
 - Werbos, P.J. "Backpropagation Through Time: What It Does and How to Do It" (BP.tex)
@@ -13,153 +20,276 @@ This code is intended for educational purposes as part of the Backpropagation Mu
 
 import numpy as np
 
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; the kernels below then run as plain NumPy
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
+@njit(cache=True, fastmath=True)
 def sigmoid(z):
-    """Sigmoid activation function."""
-    return 1 / (1 + np.exp(-z))
+    """
+    Sigmoid activation function, shared by the Python API and the kernels.
+    Uses the identity sigmoid(z) = 0.5 + 0.5 * tanh(z / 2), which cannot
+    overflow for large |z| and needs a single transcendental call.
+    """
+    return 0.5 + 0.5 * np.tanh(0.5 * z)
+
+@njit(cache=True, fastmath=True)
+def _forward_kernel(X, W_in, W_rec_T, b_h, W_out, b_y, H, Y):
+    """
+    Compiled forward pass used by SimpleRNNBPTT.forward.
+    Arrays are time-major: X is (T, batch, input). W_rec_T is a C-contiguous
+    copy of W_rec.T, so the per-step product streams it with unit stride.
+    Fills H: (T+1, batch, hidden) and Y: (T, batch, output) in place.
+    """
+    T, B, I = X.shape
+    Hd = W_rec_T.shape[0]
+    H[0] = 0.0
+
+    # The input projection does not depend on the recurrence, so it is
+    # computed for every step of every sequence in a single matrix product,
+    # written straight into H[1:] and completed step by step below.
+    np.dot(X.reshape(T * B, I), W_in.T, H[1:].reshape(T * B, Hd))
+
+    for t in range(T):
+        # z_t = W_in x_t + W_rec h_{t-1} + b_h for the whole batch at once, so
+        # the recurrent product is a (batch, hidden) x (hidden, hidden) GEMM.
+        H[t + 1] = sigmoid(H[t + 1] + np.dot(H[t], W_rec_T) + b_h)
+
+    # Outputs only depend on the hidden states, so they are batched too
+    np.dot(H[1:].reshape(T * B, Hd), W_out.T, Y.reshape(T * B, W_out.shape[0]))
+    Y += b_y
+
+@njit(cache=True, fastmath=True)
+def _backward_kernel(X, Y_true, H, Y, W_rec, W_out,
+                     dY, dZ_all, dW_in, dW_rec, dW_out, db_h, db_y):
+    """
+    Compiled BPTT pass used by SimpleRNNBPTT.backward.
+    Arrays are time-major, as in _forward_kernel. Fills dW_in, dW_rec, dW_out
+    and the bias gradients db_h, db_y in place, summed over all time steps
+    of all sequences in the batch. dY and dZ_all are scratch buffers.
+    """
+    T, B, I = X.shape
+    Hd = W_rec.shape[0]
+    O = W_out.shape[0]
 
-def sigmoid_derivative(z):
-    """Derivative of the sigmoid function."""
-    s = sigmoid(z)
-    return s * (1 - s)
+    # Output layer error for every time step at once
+    dY[:] = Y - Y_true  # dE/dy
+
+    # Only the error propagated back through W_rec is inherently
+    # sequential; the per-step dz values are collected into dZ_all.
+    dh_next = np.zeros_like(H[0])
+    for t in range(T - 1, -1, -1):
+        dh = np.dot(dY[t], W_out) + dh_next  # dE/dh_t = W_out^T dy_t + ...
+        # sigmoid'(z_t) = h_t * (1 - h_t), reusing the cached activation
+        dZ_all[t] = dh * H[t + 1] * (1.0 - H[t + 1])  # dE/dz_t
+        dh_next = np.dot(dZ_all[t], W_rec)  # Propagate to previous time step
+
+    # Sum the per-step outer products as single matrix products over all
+    # T * batch rows; these overwrite the gradient buffers, so they never
+    # need zeroing.
+    dY_flat = dY.reshape(T * B, O)
+    dZ_flat = dZ_all.reshape(T * B, Hd)
+    np.dot(dY_flat.T, H[1:].reshape(T * B, Hd), dW_out)
+    db_y[:] = dY_flat.sum(axis=0)
+    np.dot(dZ_flat.T, X.reshape(T * B, I), dW_in)
+    np.dot(dZ_flat.T, H[:-1].reshape(T * B, Hd), dW_rec)
+    db_h[:] = dZ_flat.sum(axis=0)
 
 class SimpleRNNBPTT:
     """
     Simple RNN with Backpropagation Through Time (BPTT) using NumPy.
     - One hidden layer, fully connected, with recurrent connections.
-    - Batch learning (weights updated after full sequence).
+    - Batch learning (weights updated after the full sequence, or after a
+      mini-batch of sequences of shape (batch, seq_length, features)).
     - Follows the notation and structure of Werbos's original paper.
     """
 
-    def __init__(self, input_size, hidden_size, output_size, seq_length, learning_rate=0.01):
+    def __init__(self, input_size, hidden_size, output_size, seq_length, learning_rate=0.01,
+                 dtype=np.float32):
         self.input_size = input_size
         self.hidden_size = hidden_size
         self.output_size = output_size
         self.seq_length = seq_length
         self.learning_rate = learning_rate
+        # float32 halves memory traffic and lets BLAS use the single-precision
+        # kernels; pass dtype=np.float64 for reference-precision gradients.
+        self.dtype = np.dtype(dtype)
 
         # Weight matrices
-        self.W_in = np.random.randn(hidden_size, input_size) * 0.1  # Input to hidden
-        self.W_rec = np.random.randn(hidden_size, hidden_size) * 0.1  # Hidden to hidden (recurrent)
-        self.W_out = np.random.randn(output_size, hidden_size) * 0.1  # Hidden to output
+        self.W_in = (np.random.randn(hidden_size, input_size) * 0.1).astype(dtype)  # Input to hidden
+        self.W_rec = (np.random.randn(hidden_size, hidden_size) * 0.1).astype(dtype)  # Hidden to hidden (recurrent)
+        self.W_out = (np.random.randn(output_size, hidden_size) * 0.1).astype(dtype)  # Hidden to output
 
         # Biases
-        self.b_h = np.zeros((hidden_size, 1))
-        self.b_y = np.zeros((output_size, 1))
+        self.b_h = np.zeros(hidden_size, dtype=dtype)
+        self.b_y = np.zeros(output_size, dtype=dtype)
 
-    def forward(self, X_seq):
+        # Work buffers reused by every forward/backward call
+        self._allocate_buffers(1)
+        self._dW_in = np.empty_like(self.W_in)
+        self._dW_rec = np.empty_like(self.W_rec)
+        self._dW_out = np.empty_like(self.W_out)
+        self._db_h = np.empty_like(self.b_h)
+        self._db_y = np.empty_like(self.b_y)
+        self._W_rec_T = np.empty_like(self.W_rec)
+        # Scratch for the scaled update, so callers' gradients are left intact
+        self._steps = [np.empty_like(p) for p in (self.W_in, self.W_rec, self.W_out, self.b_h, self.b_y)]
+
+    def _allocate_buffers(self, batch_size):
+        """Allocate the time-major activation buffers for a given batch size."""
+        T = self.seq_length
+        self._batch_size = batch_size
+        self._H = np.empty((T + 1, batch_size, self.hidden_size), dtype=self.dtype)
+        self._Y = np.empty((T, batch_size, self.output_size), dtype=self.dtype)
+        self._dY = np.empty((T, batch_size, self.output_size), dtype=self.dtype)
+        self._dZ_all = np.empty((T, batch_size, self.hidden_size), dtype=self.dtype)
+
+    def _time_major(self, A):
         """
-        Forward pass through the sequence.
-        X_seq: shape (seq_length, input_size)
-        Returns:
-            - h_list: list of hidden states (seq_length+1, hidden_size, 1)
-            - y_list: list of outputs (seq_length, output_size, 1)
-            - z_list: list of pre-activations for hidden (seq_length, hidden_size, 1)
+        View a (seq_length, n) sequence or a (batch, seq_length, n) batch as a
+        contiguous time-major (seq_length, batch, n) array of self.dtype.
+        Only copies when the input is not already laid out that way.
         """
-        h_prev = np.zeros((self.hidden_size, 1))
-        h_list = [h_prev]
-        y_list = []
-        z_list = []
+        A = np.asarray(A)
+        A = A[:, None, :] if A.ndim == 2 else A.transpose(1, 0, 2)
+        return np.ascontiguousarray(A, dtype=self.dtype)
 
-        for t in range(self.seq_length):
-            x_t = X_seq[t].reshape(-1, 1)
-            z_t = np.dot(self.W_in, x_t) + np.dot(self.W_rec, h_prev) + self.b_h
-            h_t = sigmoid(z_t)
-            y_t = np.dot(self.W_out, h_t) + self.b_y
+    @staticmethod
+    def _caller_layout(A, ndim):
+        """Inverse of _time_major: view a time-major array in the caller's layout."""
+        return A[:, 0, :] if ndim == 2 else A.transpose(1, 0, 2)
 
-            h_list.append(h_t)
-            y_list.append(y_t)
-            z_list.append(z_t)
-            h_prev = h_t
+    def _forward(self, X):
+        """Forward pass on a time-major batch; returns the H and Y buffers."""
+        if X.shape[1] != self._batch_size:
+            self._allocate_buffers(X.shape[1])
+        # Weights change at most once per forward pass, so the transpose used
+        # at every time step is refreshed here rather than rebuilt per step
+        np.copyto(self._W_rec_T, self.W_rec.T)
+        _forward_kernel(X, self.W_in, self._W_rec_T, self.b_h,
+                        self.W_out, self.b_y, self._H, self._Y)
+        return self._H, self._Y
 
-        return h_list, y_list, z_list
+    def _backward(self, X, Y_true, H, Y):
+        """Backward pass on time-major arrays; returns the mean-gradient buffers."""
+        _backward_kernel(X, Y_true, H, Y, self.W_rec, self.W_out,
+                         self._dY, self._dZ_all, self._dW_in, self._dW_rec,
+                         self._dW_out, self._db_h, self._db_y)
+        # Average over every time step of every sequence in this batch (taken
+        # from X, not from the activation buffers, which a later forward call
+        # may have resized), matching compute_loss
+        scale = 1.0 / (X.shape[0] * X.shape[1])
+        for grad in (self._dW_in, self._dW_rec, self._dW_out, self._db_h, self._db_y):
+            grad *= scale
+        return self._dW_in, self._dW_rec, self._dW_out, self._db_h, self._db_y
+
+    def forward(self, X_seq):
+        """
+        Forward pass through the sequence.
+        X_seq: shape (seq_length, input_size), or (batch, seq_length, input_size)
+        Returns:
+            - H: hidden states, shape (seq_length+1, hidden_size); H[0] is the initial state
+            - Y: outputs, shape (seq_length, output_size)
+        with a leading batch dimension when X_seq has one. Both are views of
+        internal buffers, overwritten by the next call to forward.
+        """
+        H, Y = self._forward(self._time_major(X_seq))
+        ndim = np.ndim(X_seq)
+        return self._caller_layout(H, ndim), self._caller_layout(Y, ndim)
 
     def compute_loss(self, Y_pred, Y_true):
         """
-        Mean squared error loss over the sequence.
-        Y_pred, Y_true: lists of (output_size, 1) arrays
+        Mean squared error loss over the sequence (and batch).
+        Y_pred, Y_true: arrays of shape (seq_length, output_size), or
+        (batch, seq_length, output_size)
         """
-        loss = 0.0
-        for y_pred, y_true in zip(Y_pred, Y_true):
-            loss += 0.5 * np.sum((y_pred - y_true.reshape(-1, 1)) ** 2)
-        return loss / len(Y_pred)
+        diff = (Y_pred - Y_true).ravel()
+        # A dot product squares and sums in one BLAS call, without a temporary
+        return 0.5 * diff.dot(diff) / (diff.size // self.output_size)
 
-    def backward(self, X_seq, Y_true, h_list, y_list, z_list):
+    def backward(self, X_seq, Y_true, H, Y):
         """
         Backward pass (BPTT) to compute gradients.
-        Returns gradients for all weights and biases.
+        Takes the inputs and targets in the same layout as forward, with the
+        H and Y it returned. Returns the gradients of compute_loss for all
+        weights and biases, i.e. averaged over all time steps (and sequences
+        in the batch). The gradients are internal buffers, overwritten by the
+        next call to backward.
         """
-        # Initialize gradients
-        dW_in = np.zeros_like(self.W_in)
-        dW_rec = np.zeros_like(self.W_rec)
-        dW_out = np.zeros_like(self.W_out)
-        db_h = np.zeros_like(self.b_h)
-        db_y = np.zeros_like(self.b_y)
-
-        dh_next = np.zeros((self.hidden_size, 1))
-
-        for t in reversed(range(self.seq_length)):
-            y_pred = y_list[t]
-            y_true = Y_true[t].reshape(-1, 1)
-            h_t = h_list[t+1]
-            h_prev = h_list[t]
-            z_t = z_list[t]
-            x_t = X_seq[t].reshape(-1, 1)
-
-            # Output layer gradients
-            dy = y_pred - y_true  # dE/dy
-            dW_out += np.dot(dy, h_t.T)
-            db_y += dy
-
-            # Hidden layer gradients (BPTT)
-            dh = np.dot(self.W_out.T, dy) + dh_next  # dE/dh_t
-            dz = dh * sigmoid_derivative(z_t)        # dE/dz_t
-
-            dW_in += np.dot(dz, x_t.T)
-            dW_rec += np.dot(dz, h_prev.T)
-            db_h += dz
-
-            dh_next = np.dot(self.W_rec.T, dz)  # Propagate to previous time step
-
-        # Average gradients over sequence
-        for grad in [dW_in, dW_rec, dW_out, db_h, db_y]:
-            grad /= self.seq_length
-
-        return dW_in, dW_rec, dW_out, db_h, db_y
+        return self._backward(self._time_major(X_seq), self._time_major(Y_true),
+                              self._time_major(H), self._time_major(Y))
 
     def update_weights(self, dW_in, dW_rec, dW_out, db_h, db_y):
-        """Update weights and biases using computed gradients."""
-        self.W_in -= self.learning_rate * dW_in
-        self.W_rec -= self.learning_rate * dW_rec
-        self.W_out -= self.learning_rate * dW_out
-        self.b_h -= self.learning_rate * db_h
-        self.b_y -= self.learning_rate * db_y
+        """
+        Update weights and biases using computed gradients.
+        The learning-rate scaling is written into preallocated scratch arrays,
+        so the given gradients are not modified and no temporaries are allocated.
+        """
+        params = (self.W_in, self.W_rec, self.W_out, self.b_h, self.b_y)
+        grads = (dW_in, dW_rec, dW_out, db_h, db_y)
+        for param, grad, step in zip(params, grads, self._steps):
+            np.multiply(grad, -self.learning_rate, out=step)
+            param += step
 
     def train(self, X_seq, Y_seq, epochs=1000, verbose=100):
         """
         Train the RNN using BPTT.
-        X_seq: shape (seq_length, input_size)
-        Y_seq: shape (seq_length, output_size)
+        X_seq: shape (seq_length, input_size), or (batch, seq_length, input_size)
+        Y_seq: shape (seq_length, output_size), or (batch, seq_length, output_size)
+        verbose: print the loss every `verbose` epochs; 0 or None to stay silent
+        Returns the loss of every epoch as a list.
         """
+        # Convert once up front so the epochs run directly on time-major arrays
+        X = self._time_major(X_seq)
+        Y_true = self._time_major(Y_seq)
+
+        losses = []
         for epoch in range(1, epochs + 1):
-            h_list, y_list, z_list = self.forward(X_seq)
-            loss = self.compute_loss(y_list, Y_seq)
-            dW_in, dW_rec, dW_out, db_h, db_y = self.backward(X_seq, Y_seq, h_list, y_list, z_list)
+            H, Y = self._forward(X)
+            loss = self.compute_loss(Y, Y_true)
+            dW_in, dW_rec, dW_out, db_h, db_y = self._backward(X, Y_true, H, Y)
             self.update_weights(dW_in, dW_rec, dW_out, db_h, db_y)
+            losses.append(float(loss))
 
-            if epoch % verbose == 0 or epoch == 1:
+            if verbose and (epoch % verbose == 0 or epoch == 1):
                 print(f"Epoch {epoch}: Loss = {loss:.6f}")
 
-# Example usage (for demonstration/testing)
-if __name__ == "__main__":
-    np.random.seed(42)
-    seq_length = 5
-    input_size = 2
-    hidden_size = 4
-    output_size = 1
+        return losses
 
-    # Generate a toy sequence problem (e.g., sum of inputs)
+def train_one(seed, learning_rate, epochs=500, seq_length=5, input_size=2, hidden_size=4,
+              output_size=1, verbose=0):
+    """
+    Train a fresh SimpleRNNBPTT on the toy problem (target = sum of inputs)
+    from a given seed, which fixes both the data and the initial weights.
+    Returns the loss curve.
+    """
+    np.random.seed(seed)
     X_seq = np.random.randn(seq_length, input_size)
     Y_seq = np.sum(X_seq, axis=1, keepdims=True)  # Simple regression target
 
-    rnn = SimpleRNNBPTT(input_size, hidden_size, output_size, seq_length, learning_rate=0.05)
-    rnn.train(X_seq, Y_seq, epochs=500, verbose=100)
+    rnn = SimpleRNNBPTT(input_size, hidden_size, output_size, seq_length, learning_rate=learning_rate)
+    return rnn.train(X_seq, Y_seq, epochs=epochs, verbose=verbose)
+
+def sweep(seeds, learning_rates, n_jobs=-1, **kwargs):
+    """
+    Run train_one for every (seed, learning_rate) pair in parallel worker
+    processes. Extra keyword arguments are passed to train_one.
+    Returns a dict mapping (seed, learning_rate) to its loss curve.
+    """
+    # joblib is only needed for sweeps, so it is imported here
+    from joblib import Parallel, delayed, parallel_config
+
+    runs = [(seed, lr) for seed in seeds for lr in learning_rates]
+    # One BLAS thread per worker: the runs themselves are the parallelism,
+    # and multithreaded BLAS in every worker would oversubscribe the cores.
+    with parallel_config(backend="loky", inner_max_num_threads=1):
+        curves = Parallel(n_jobs=n_jobs)(delayed(train_one)(seed, lr, **kwargs) for seed, lr in runs)
+    return dict(zip(runs, curves))
+
+# Example usage (for demonstration/testing)
+if __name__ == "__main__":
+    train_one(seed=42, learning_rate=0.05, epochs=500, verbose=100)
@@ -8,14 +8,18 @@ import asyncio
 import json
 import logging
 import os
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 from pathlib import Path
 
 import aiohttp
+import orjson
 import uvicorn
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from pydantic import BaseModel
 import openai
 from dotenv import load_dotenv
@@ -30,6 +34,80 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Tool and resource listings are constant for the lifetime of the process
+TOOLS = [
+    {
+        "name": "web_search",
+        "description": "Search the web for information about backpropagation and neural networks",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "Search query"},
+                "max_results": {"type": "integer", "default": 10}
+            },
+            "required": ["query"]
+        }
+    },
+    {
+        "name": "arxiv_search",
+        "description": "Search arXiv for academic papers related to backpropagation",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "Search query"},
+                "max_results": {"type": "integer", "default": 5}
+            },
+            "required": ["query"]
+        }
+    },
+    {
+        "name": "generate_backprop_code",
+        "description": "Generate backpropagation implementation code using OpenAI Codex",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "framework": {"type": "string", "enum": ["numpy", "pytorch", "tensorflow"], "default": "numpy"},
+                "complexity": {"type": "string", "enum": ["simple", "advanced"], "default": "simple"}
+            }
+        }
+    },
+    {
+        "name": "latex_to_code",
+        "description": "Convert LaTeX mathematical expressions to executable code",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "latex_content": {"type": "string", "description": "LaTeX mathematical expression"},
+                "target_language": {"type": "string", "enum": ["python", "numpy", "pytorch"], "default": "python"}
+            },
+            "required": ["latex_content"]
+        }
+    }
+]
+
+RESOURCES = [
+    {
+        "uri": "file://BP.tex",
+        "name": "Backpropagation Paper (LaTeX)",
+        "description": "Original backpropagation paper in LaTeX format"
+    },
+    {
+        "uri": "file://BP_review.md",
+        "name": "Backpropagation Review",
+        "description": "Review and summary of the backpropagation paper"
+    },
+    {
+        "uri": "file://Werbos-Backpropagation20through20time.pdf",
+        "name": "Werbos Backpropagation Through Time",
+        "description": "Historical paper on backpropagation through time"
+    }
+]
+
+@lru_cache(maxsize=32)
+def read_text_cached(path: str, mtime_ns: int) -> str:
+    """Read a UTF-8 text file; the mtime key invalidates the entry when the file changes"""
+    return Path(path).read_text(encoding="utf-8")
+
 class MCPRequest(BaseModel):
     """MCP protocol request model"""
     method: str
@@ -46,7 +124,10 @@ class BackpropagationMCPServer:
     """MCP Server for Backpropagation implementation with internet access"""
     
     def __init__(self):
-        self.app = FastAPI(title="Backpropagation MCP Server")
+        # Shared HTTP session for outbound requests, reused across tool calls
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        self.app = FastAPI(title="Backpropagation MCP Server", lifespan=self.lifespan)
         self.setup_cors()
         self.setup_routes()
         
@@ -58,8 +139,44 @@ class BackpropagationMCPServer:
         self.allowed_domains = os.getenv("ALLOWED_DOMAINS", "").split(",")
         self.max_requests_per_minute = int(os.getenv("MAX_NETWORK_REQUESTS_PER_MINUTE", "60"))
         
+        # Responses that never change while the server runs, serialized once
+        self._capabilities_json = orjson.dumps({
+            "internet_access": self.internet_enabled,
+            "allowed_domains": self.allowed_domains,
+            "backpropagation_tools": True,
+            "latex_processing": True,
+            "openai_integration": bool(os.getenv("OPENAI_API_KEY"))
+        })
+        self._cached_results = {
+            "tools/list": orjson.dumps({"tools": TOOLS}),
+            "resources/list": orjson.dumps({"resources": RESOURCES}),
+        }
+        
         logger.info(f"MCP Server initialized with internet access: {self.internet_enabled}")
 
+    @asynccontextmanager
+    async def lifespan(self, app: FastAPI):
+        """Open the shared HTTP session on startup and close it on shutdown"""
+        await self.get_session()
+        yield
+        await self.close()
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """
+        Return the shared HTTP session, creating it on first use.
+        Inside the app the lifespan closes it; code that calls the tool
+        methods directly must await close() when done.
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+        return self._session
+
+    async def close(self):
+        """Close the shared HTTP session, if one is open"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
     def setup_cors(self):
         """Setup CORS middleware for web access"""
         self.app.add_middleware(
@@ -76,6 +193,13 @@ class BackpropagationMCPServer:
         @self.app.post("/mcp")
         async def handle_mcp_request(request: MCPRequest):
             """Handle MCP protocol requests"""
+            cached = self._cached_results.get(request.method)
+            if cached is not None:
+                # Splice the prebuilt result into the MCPResponse envelope
+                return Response(
+                    b'{"result":' + cached + b',"error":null,"id":' + orjson.dumps(request.id) + b'}',
+                    media_type="application/json"
+                )
             try:
                 result = await self.process_mcp_request(request)
                 return MCPResponse(result=result, id=request.id)
@@ -94,13 +218,7 @@ class BackpropagationMCPServer:
         @self.app.get("/capabilities")
         async def get_capabilities():
             """Return server capabilities"""
-            return {
-                "internet_access": self.internet_enabled,
-                "allowed_domains": self.allowed_domains,
-                "backpropagation_tools": True,
-                "latex_processing": True,
-                "openai_integration": bool(os.getenv("OPENAI_API_KEY"))
-            }
+            return Response(self._capabilities_json, media_type="application/json")
 
     async def process_mcp_request(self, request: MCPRequest) -> Dict[str, Any]:
         """Process MCP protocol requests"""
@@ -120,57 +238,7 @@ class BackpropagationMCPServer:
 
     async def list_tools(self) -> Dict[str, Any]:
         """List available tools"""
-        tools = [
-            {
-                "name": "web_search",
-                "description": "Search the web for information about backpropagation and neural networks",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "query": {"type": "string", "description": "Search query"},
-                        "max_results": {"type": "integer", "default": 10}
-                    },
-                    "required": ["query"]
-                }
-            },
-            {
-                "name": "arxiv_search",
-                "description": "Search arXiv for academic papers related to backpropagation",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "query": {"type": "string", "description": "Search query"},
-                        "max_results": {"type": "integer", "default": 5}
-                    },
-                    "required": ["query"]
-                }
-            },
-            {
-                "name": "generate_backprop_code",
-                "description": "Generate backpropagation implementation code using OpenAI Codex",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "framework": {"type": "string", "enum": ["numpy", "pytorch", "tensorflow"], "default": "numpy"},
-                        "complexity": {"type": "string", "enum": ["simple", "advanced"], "default": "simple"}
-                    }
-                }
-            },
-            {
-                "name": "latex_to_code",
-                "description": "Convert LaTeX mathematical expressions to executable code",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "latex_content": {"type": "string", "description": "LaTeX mathematical expression"},
-                        "target_language": {"type": "string", "enum": ["python", "numpy", "pytorch"], "default": "python"}
-                    },
-                    "required": ["latex_content"]
-                }
-            }
-        ]
-        
-        return {"tools": tools}
+        return {"tools": TOOLS}
 
     async def call_tool(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Call a specific tool"""
@@ -197,26 +265,28 @@ class BackpropagationMCPServer:
         max_results = args.get("max_results", 10)
         
         # This is a simplified implementation - in practice you'd use a proper search API
-        async with aiohttp.ClientSession() as session:
-            search_url = f"https://api.duckduckgo.com/?q={query}&format=json&no_html=1"
-            
-            try:
-                async with session.get(search_url) as response:
-                    data = await response.json()
-                    
-                    results = []
-                    for item in data.get("RelatedTopics", [])[:max_results]:
-                        if "Text" in item and "FirstURL" in item:
-                            results.append({
-                                "title": item.get("Text", "")[:100],
-                                "url": item.get("FirstURL", ""),
-                                "snippet": item.get("Text", "")
-                            })
-                    
-                    return {"results": results}
-            except Exception as e:
-                logger.error(f"Web search error: {str(e)}")
-                return {"error": str(e), "results": []}
+        session = await self.get_session()
+        search_url = "https://api.duckduckgo.com/"
+        search_params = {"q": query, "format": "json", "no_html": "1"}
+        
+        try:
+            async with session.get(search_url, params=search_params) as response:
+                response.raise_for_status()
+                data = orjson.loads(await response.read())
+                
+                results = []
+                for item in data.get("RelatedTopics", [])[:max_results]:
+                    if "Text" in item and "FirstURL" in item:
+                        results.append({
+                            "title": item.get("Text", "")[:100],
+                            "url": item.get("FirstURL", ""),
+                            "snippet": item.get("Text", "")
+                        })
+                
+                return {"results": results}
+        except Exception as e:
+            logger.error(f"Web search error: {str(e)}")
+            return {"error": str(e), "results": []}
 
     async def arxiv_search(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Search arXiv for academic papers"""
@@ -227,17 +297,19 @@ class BackpropagationMCPServer:
         max_results = args.get("max_results", 5)
         
         # arXiv API search
-        arxiv_url = f"http://export.arxiv.org/api/query?search_query=all:{query}&start=0&max_results={max_results}"
+        arxiv_url = "http://export.arxiv.org/api/query"
+        arxiv_params = {"search_query": f"all:{query}", "start": "0", "max_results": str(max_results)}
         
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(arxiv_url) as response:
-                    content = await response.text()
-                    # Parse XML response (simplified)
-                    return {"arxiv_results": content[:1000]}  # Truncated for brevity
-            except Exception as e:
-                logger.error(f"arXiv search error: {str(e)}")
-                return {"error": str(e)}
+        session = await self.get_session()
+        try:
+            async with session.get(arxiv_url, params=arxiv_params) as response:
+                response.raise_for_status()
+                content = await response.text()
+                # Parse XML response (simplified)
+                return {"arxiv_results": content[:1000]}  # Truncated for brevity
+        except Exception as e:
+            logger.error(f"arXiv search error: {str(e)}")
+            return {"error": str(e)}
 
     async def generate_backprop_code(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Generate backpropagation code using OpenAI Codex"""
@@ -301,25 +373,7 @@ class BackpropagationMCPServer:
 
     async def list_resources(self) -> Dict[str, Any]:
         """List available resources"""
-        resources = [
-            {
-                "uri": "file://BP.tex",
-                "name": "Backpropagation Paper (LaTeX)",
-                "description": "Original backpropagation paper in LaTeX format"
-            },
-            {
-                "uri": "file://BP_review.md",
-                "name": "Backpropagation Review",
-                "description": "Review and summary of the backpropagation paper"
-            },
-            {
-                "uri": "file://Werbos-Backpropagation20through20time.pdf",
-                "name": "Werbos Backpropagation Through Time",
-                "description": "Historical paper on backpropagation through time"
-            }
-        ]
-        
-        return {"resources": resources}
+        return {"resources": RESOURCES}
 
     async def read_resource(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Read a specific resource"""
@@ -331,8 +385,7 @@ class BackpropagationMCPServer:
             
             if filepath.exists():
                 try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        content = f.read()
+                    content = read_text_cached(str(filepath), filepath.stat().st_mtime_ns)
                     return {"content": content, "uri": uri}
                 except Exception as e:
                     return {"error": f"Failed to read file: {str(e)}"}
@@ -351,10 +404,15 @@ if __name__ == "__main__":
     
     logger.info(f"Starting Backpropagation MCP Server on {host}:{port}")
     
+    # "auto" picks uvloop and httptools when installed (they are not available
+    # on Windows) and falls back to asyncio and h11 otherwise
     uvicorn.run(
         "mcp_server:app",
         host=host,
         port=port,
-        reload=True,
+        loop="auto",
+        http="auto",
+        workers=int(os.getenv("MCP_SERVER_WORKERS", "1")),
+        reload=os.getenv("MCP_SERVER_RELOAD", "false").lower() == "true",
         log_level=os.getenv("MCP_SERVER_LOG_LEVEL", "info").lower()
     ) 
\ No newline at end of file
@@ -104,8 +104,17 @@ try {
         & ".\venv\Scripts\python.exe" mcp_server.py
     }
     
-    # Wait a moment for server to start
-    Start-Sleep 3
+    # Poll until the server answers instead of sleeping a fixed time
+    $deadline = (Get-Date).AddSeconds(15)
+    $serverReady = $false
+    while (-not $serverReady -and $serverJob.State -notin @("Completed", "Failed", "Stopped") -and (Get-Date) -lt $deadline) {
+        try {
+            Invoke-WebRequest -Uri "http://localhost:8000/health" -TimeoutSec 1 -UseBasicParsing | Out-Null
+            $serverReady = $true
+        } catch {
+            Start-Sleep -Milliseconds 250
+        }
+    }
     
     # Test health endpoint
     try {